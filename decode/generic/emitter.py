@@ -67,6 +67,11 @@ class EmitterSet:
         self.prob = None
         self.bg = None
 
+        """Convert ndarray inputs zero-copy; from_numpy shares memory with the array."""
+        xyz, phot, frame_ix, id, prob, bg, xyz_cr, phot_cr, bg_cr, xyz_sig, phot_sig, bg_sig = (
+            torch.from_numpy(x) if isinstance(x, np.ndarray) else x
+            for x in (xyz, phot, frame_ix, id, prob, bg, xyz_cr, phot_cr, bg_cr, xyz_sig, phot_sig, bg_sig))
+
         # Cramer-Rao values
         self.xyz_cr = None
         self.phot_cr = None
@@ -91,15 +91,16 @@ class RemoveOutOfFOV(ProcessEmitters):
 
         return is_emit
 
-    def forward(self, em_set):
+    def clean_mask(self, em_set):
         """
-        Removes emitters that are outside of the specified extent.
+        Returns boolean index of emitters that are inside the specified extent, without gathering. Useful to
+        combine with other masks before a single gather.
 
         Args:
             em_set:
 
         Returns:
-            EmitterSet
+            torch.BoolTensor
         """
 
         if self.xy_unit is None:
@@ -111,6 +112,17 @@ class RemoveOutOfFOV(ProcessEmitters):
         else:
             raise ValueError(f"Unsupported xy unit: {self.xy_unit}")
 
-        is_emit = self.clean_emitter(em_mat)
+        return self.clean_emitter(em_mat)
+
+    def forward(self, em_set):
+        """
+        Removes emitters that are outside of the specified extent.
+
+        Args:
+            em_set:
+
+        Returns:
+            EmitterSet
+        """
 
-        return em_set[is_emit]
+        return em_set[self.clean_mask(em_set)]
@@ -1,4 +1,3 @@
-import numpy as np
 import torch
 
 
@@ -34,13 +33,17 @@ def split_sliceable(x, x_ix: torch.Tensor, ix_low: int, ix_high: int):
     x = x[re]
 
     """
-    arange( + 2) because + 1 for pythonic and another + 1 because the loop before return below goes from 0 to on 
-    range('len' - 1)
+    arange( + 2) because + 1 for pythonic and another + 1 because the loop before return below goes from 0 to on
+    range('len' - 1). The boundaries are computed once on the sorted index; the elements of the returned list are
+    then mere slices.
     """
-    picker = np.arange(ix_low, ix_high + 2)
-    ix_sort = np.searchsorted(x_ix, picker)
+    if ix_low > ix_high + 1:  # empty index range
+        return []
 
-    return [x[ix_sort[i]:ix_sort[i + 1]] for i in range(ix_sort.shape[0] - 1)]
+    picker = torch.arange(ix_low, ix_high + 2, dtype=x_ix.dtype)
+    ix_sort = torch.searchsorted(x_ix, picker).tolist()
+
+    return [x[ix_sort[i]:ix_sort[i + 1]] for i in range(len(ix_sort) - 1)]
 
 
 def ix_split(ix: torch.Tensor, ix_min: int, ix_max: int):
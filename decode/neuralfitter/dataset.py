@@ -1,5 +1,6 @@
 import time
 
+import numpy as np
 import torch
 from torch.utils.data import Dataset
 
@@ -15,7 +16,8 @@ class SMLMDataset(Dataset):
     _pad_modes = (None, 'same')
 
     def __init__(self, *, em_proc, frame_proc, bg_frame_proc, tar_gen, weight_gen,
-                 frame_window: int, pad: str = None, return_em: bool):
+                 frame_window: int, pad: str = None, return_em: bool, pin_memory: bool = True,
+                 share_memory: bool = False):
         """
         Init new dataset.
 
@@ -28,11 +30,19 @@ class SMLMDataset(Dataset):
             frame_window: number of frames per sample / size of frame window
             pad: pad mode, applicable for first few, last few frames (relevant when frame window is used)
             return_em: return target emitter
+            pin_memory: store the frames in page-locked memory (only in effect when CUDA is available), which
+                avoids the pageable to pinned staging copy before the host to device transfer
+            share_memory: move the frames to shared memory, such that all DataLoader workers read the same
+                physical pages instead of each holding a copy. Mutually exclusive with pin_memory; frames must
+                be treated read-only.
 
         """
         super().__init__()
 
         self._frames = None
+        self._frames_mf = None
+        self._edge_win = None
+        self._win_lut = None
         self._emitter = None
 
         self.em_proc = em_proc
@@ -44,6 +54,8 @@ class SMLMDataset(Dataset):
         self.frame_window = frame_window
         self.pad = pad
         self.return_em = return_em
+        self.pin_memory = pin_memory
+        self.share_memory = share_memory
 
         """Sanity"""
         self.sanity_check()
@@ -70,8 +82,89 @@ class SMLMDataset(Dataset):
     def _get_frames(self, frames, index):
         hw = (self.frame_window - 1) // 2  # half window without centre
 
-        frame_ix = torch.arange(index - hw, index + hw + 1).clamp(0, len(frames) - 1)
-        return frames[frame_ix]
+        if hw <= index <= len(frames) - hw - 1:
+            # interior window; zero-copy view, neither index tensor nor gather allocation per call
+            return frames.narrow(0, index - hw, self.frame_window)
+
+        return frames[self._window_ix_lut(len(frames))[index]]
+
+    def _window_ix_lut(self, n: int) -> torch.Tensor:
+        """
+        Table of clamped window indices per centre index, computed once per (n, frame_window) and cached.
+        Replaces per-access index arithmetic and clamping with a single lookup.
+
+        Args:
+            n (int): number of frames
+
+        """
+        if self._win_lut is None or self._win_lut.size() != torch.Size([n, self.frame_window]):
+            hw = (self.frame_window - 1) // 2
+            self._win_lut = (torch.arange(n).unsqueeze(1)
+                             + torch.arange(-hw, hw + 1).unsqueeze(0)).clamp(0, n - 1)
+
+        return self._win_lut
+
+    def _setup_frames_mf(self):
+        """
+        Precompute a strided multi-frame view on the raw frames, accessible per (raw, i.e. non-padded) sample
+        index via _window. The view shares memory with the frames, i.e. no copy happens per access as opposed
+        to gathering the window frame by frame in __getitem__. For pad 'same' only the few border windows,
+        which replicate the edge frame, are materialized individually; the frame stack itself is never copied.
+
+        """
+        if self._frames is None:
+            self._frames_mf = None
+            self._edge_win = None
+            return
+
+        hw = (self.frame_window - 1) // 2  # half window without centre
+
+        frames = self._frames
+        if not frames.is_contiguous():
+            # guarantee row-major layout, such that every window of the view below is one contiguous block
+            frames = frames.contiguous()
+            self._frames = frames
+
+        if self.share_memory:
+            if not frames.is_shared():
+                frames.share_memory_()  # in-place, one shared copy for all DataLoader workers
+        elif self.pin_memory and torch.cuda.is_available() and not frames.is_pinned():
+            frames = frames.pin_memory()
+            self._frames = frames  # drop the pageable original
+
+        n = frames.size(0)
+        self._frames_mf = frames.unfold(0, self.frame_window, 1).permute(0, 3, 1, 2) \
+            if n >= self.frame_window else None
+
+        if self.pad == 'same' and hw > 0:
+            edge_ix = set(range(min(hw, n))) | set(range(max(n - hw, 0), n))
+            self._edge_win = {ix: self._get_frames(frames, ix) for ix in sorted(edge_ix)}
+        else:
+            self._edge_win = None
+
+        """Specialize the window accessor once per setup; per access there is no pad-mode branching."""
+        self._window = self._window_same if self._edge_win is not None else self._window_direct
+
+    def _window(self, ix: int) -> torch.Tensor:
+        """
+        Frame window of (raw) sample index ix; a view into the frame stack wherever possible. Rebound to a
+        specialized implementation in _setup_frames_mf.
+
+        Args:
+            ix (int): raw sample index
+
+        """
+        raise RuntimeError("No frames set. Construct with frames or draw a new sample first.")
+
+    def _window_direct(self, ix: int) -> torch.Tensor:
+        return self._frames_mf[ix]
+
+    def _window_same(self, ix: int) -> torch.Tensor:
+        edge = self._edge_win.get(ix)
+        if edge is not None:
+            return edge
+
+        return self._frames_mf[ix - (self.frame_window - 1) // 2]
 
     def _pad_index(self, index):
 
@@ -131,7 +224,9 @@ class SMLMStaticDataset(SMLMDataset):
 
     def __init__(self, *, frames, emitter: (None, list, tuple),
                  frame_proc=None, bg_frame_proc=None, em_proc=None, tar_gen=None,
-                 bg_frames=None, weight_gen=None, frame_window=3, pad: (str, None) = None, return_em=True):
+                 bg_frames=None, weight_gen=None, frame_window=3, pad: (str, None) = None, return_em=True,
+                 precompute_targets: bool = True, pin_memory: bool = True, share_memory: bool = False,
+                 frame_dtype=None):
         """
 
         Args:
@@ -143,22 +238,131 @@ class SMLMStaticDataset(SMLMDataset):
             weight_gen: weight generator function
             frame_window (int): width of frame window
             return_em (bool): return EmitterSet in getitem method.
+            precompute_targets (bool): generate all targets once at construction instead of per __getitem__ call.
+                Disable for non-deterministic target generators.
+            pin_memory (bool): store frames in page-locked memory (only in effect when CUDA is available)
+            share_memory (bool): move frames to shared memory so that all DataLoader workers read the same
+                physical copy. Mutually exclusive with pin_memory.
+            frame_dtype (torch.dtype): storage dtype of the frames, e.g. torch.float16 to halve memory footprint
+                and bytes moved per access. Samples are cast back to the input dtype on return. If None (default)
+                the frames are stored as provided.
         """
 
         super().__init__(em_proc=em_proc, frame_proc=frame_proc, bg_frame_proc=bg_frame_proc,
                          tar_gen=tar_gen, weight_gen=weight_gen,
-                         frame_window=frame_window, pad=pad, return_em=return_em)
+                         frame_window=frame_window, pad=pad, return_em=return_em, pin_memory=pin_memory,
+                         share_memory=share_memory)
+
+        if isinstance(frames, np.ndarray):  # zero-copy, shares memory with the array
+            frames = torch.from_numpy(frames)
+        if isinstance(bg_frames, np.ndarray):
+            bg_frames = torch.from_numpy(bg_frames)
+
+        self._frames_read_dtype = None
+        if frames is not None and frame_dtype is not None and frames.dtype != frame_dtype:
+            self._frames_read_dtype = frames.dtype
+            frames = frames.to(frame_dtype)
 
         self._frames = frames
         self._emitter = emitter
         self._bg_frames = bg_frames
 
+        self.precompute_targets = precompute_targets
+        self._em_cache = None
+        self._tar_cache = None
+
         if self._frames is not None and self._frames.dim() != 3:
             raise ValueError("Frames must be 3 dimensional, i.e. N x H x W.")
 
         if self._emitter is not None and not isinstance(self._emitter, (list, tuple)):
             raise TypeError("Please split emitters in list of emitters by their frame index first.")
 
+        if self._frames is not None:
+            self._setup_frames_mf()
+
+        if self.precompute_targets and self.tar_gen is not None and self._emitter is not None:
+            self._precompute_targets()
+
+    @classmethod
+    def from_memmap(cls, path, *, shape: tuple = None, dtype: str = 'float32', offset: int = 0, **kwargs):
+        """
+        Construct the dataset on memory-mapped frames from a .npy or raw binary file. Only the pages of the
+        accessed samples are loaded, i.e. the frame stack may exceed the machine's RAM. Memory pinning is
+        disabled by default since it would force the whole map into RAM.
+
+        Args:
+            path: path to the .npy or raw binary file
+            shape: shape of the frames (N, H, W), for raw binary files
+            dtype: numpy dtype of the raw binary data
+            offset: offset in bytes into the raw binary file
+            **kwargs: arguments as in __init__
+
+        """
+        from decode.utils import frames_io
+
+        kwargs.setdefault('pin_memory', False)
+        return cls(frames=frames_io.load_memmap(path, shape=shape, dtype=dtype, offset=offset), **kwargs)
+
+    def _precompute_targets(self):
+        """
+        Generate all targets once. Emitters and background frames are fixed at construction time, so the
+        (deterministic) target of every sample can be computed here instead of on every __getitem__ call.
+
+        """
+
+        em = [self.em_proc.forward(e) for e in self._emitter] if self.em_proc is not None else list(self._emitter)
+
+        if self._bg_frames is not None:
+            bg = [self.bg_frame_proc.forward(b) for b in self._bg_frames] if self.bg_frame_proc is not None \
+                else list(self._bg_frames)
+        else:
+            bg = [None] * len(em)
+
+        self._em_cache = em
+
+        """Batch all samples into a single target generator call where the generator supports it and its
+        per-sample output is squeezed (a batch row then equals the per-sample target). Otherwise fall back
+        to the per-sample loop."""
+        if hasattr(self.tar_gen, 'forward_list') and getattr(self.tar_gen, 'squeeze_batch_dim', False):
+            self._tar_cache = self.tar_gen.forward_list(em, bg if self._bg_frames is not None else None)
+            return
+
+        self._tar_cache = [self.tar_gen.forward(e, b) for e, b in zip(em, bg)]
+
+        """Stack homogeneous targets into one contiguous tensor; per-sample access then returns views of it.
+        Tuple-type or ragged targets (e.g. parameter list targets) stay as list."""
+        if len(self._tar_cache) >= 1 and all(isinstance(t, torch.Tensor) and t.size() == self._tar_cache[0].size()
+                                             for t in self._tar_cache):
+            self._tar_cache = torch.stack(self._tar_cache, 0)
+
+    def _process_sample_static(self, frames, ix):
+        """
+        Process a sample, serving emitter and target from the precomputed cache if present.
+
+        Args:
+            frames: frame window of the sample
+            ix: padded index
+
+        """
+
+        if self._tar_cache is None:
+            tar_emitter = self._emitter[ix] if self._emitter is not None else None
+            bg_frame = self._bg_frames[ix] if self._bg_frames is not None else None
+
+            return self._process_sample(frames, tar_emitter, bg_frame)
+
+        if self.frame_proc is not None:
+            frames = self.frame_proc.forward(frames)
+
+        tar_emitter = self._em_cache[ix]
+        if isinstance(self._tar_cache, tuple):  # batched tuple-type target, e.g. parameter list
+            target = tuple(t[ix] if t is not None else None for t in self._tar_cache)
+        else:
+            target = self._tar_cache[ix]
+        weight = self.weight_gen.forward(tar_emitter, target) if self.weight_gen is not None else None
+
+        return frames, target, weight, tar_emitter
+
     def __getitem__(self, ix):
         """
         Get a training sample.
@@ -173,17 +377,43 @@ class SMLMStaticDataset(SMLMDataset):
 
         """
 
-        """Pad index, get frames and emitters."""
+        """Pad index, get frames and emitters. The multi-frame view is indexed by the raw index."""
+        frames = self._window(ix)
+        if self._frames_read_dtype is not None:
+            frames = frames.to(self._frames_read_dtype)
         ix = self._pad_index(ix)
 
-        tar_emitter = self._emitter[ix] if self._emitter is not None else None
-        frames = self._get_frames(self._frames, ix)
-        bg_frame = self._bg_frames[ix] if self._bg_frames is not None else None
-
-        frames, target, weight, tar_emitter = self._process_sample(frames, tar_emitter, bg_frame)
+        frames, target, weight, tar_emitter = self._process_sample_static(frames, ix)
 
         return self._return_sample(frames, target, weight, tar_emitter)
 
+    def __getitems__(self, ixs) -> list:
+        """
+        Get a batch of training samples at once. Picked up by the DataLoader's fetcher (if present) instead of
+        looping over __getitem__ per index; the frame windows are gathered in a single vectorized indexing
+        operation, processing and target generation stay per sample.
+
+        Args:
+            ixs: batch of indices
+
+        Returns:
+            list of samples as returned by __getitem__
+
+        """
+
+        frames_batch = torch.stack([self._window(int(ix)) for ix in ixs], 0)
+        if self._frames_read_dtype is not None:
+            frames_batch = frames_batch.to(self._frames_read_dtype)
+
+        samples = []
+        for frames, ix in zip(frames_batch.unbind(0), ixs):
+            ix = self._pad_index(ix)
+
+            frames, target, weight, tar_emitter = self._process_sample_static(frames, ix)
+            samples.append(self._return_sample(frames, target, weight, tar_emitter))
+
+        return samples
+
 
 class InferenceDataset(SMLMStaticDataset):
     """
@@ -191,16 +421,19 @@ class InferenceDataset(SMLMStaticDataset):
     This is dummy wrapper to keep the visual appearance of a separate dataset.
     """
 
-    def __init__(self, *, frames, frame_proc, frame_window):
+    def __init__(self, *, frames, frame_proc, frame_window, pin_memory: bool = False):
         """
 
         Args:
             frames (torch.Tensor): frames
             frame_proc: frame processing function
             frame_window (int): frame window
+            pin_memory (bool): store frames in page-locked memory. Off by default since inference runs on
+                whole (possibly huge) acquisitions for which pinned allocation may fail.
         """
         super().__init__(frames=frames, emitter=None, frame_proc=frame_proc, bg_frame_proc=None, em_proc=None,
-                         tar_gen=None, pad='same', frame_window=frame_window, return_em=False)
+                         tar_gen=None, pad='same', frame_window=frame_window, return_em=False,
+                         pin_memory=pin_memory)
 
     def _return_sample(self, frame, target, weight, emitter):
         return frame
@@ -256,6 +489,7 @@ class SMLMLiveDataset(SMLMStaticDataset):
         self._emitter = emitter
         self._frames = frames.cpu()
         self._bg_frames = bg_frames.cpu()
+        self._setup_frames_mf()
 
 
 class SMLMAPrioriDataset(SMLMLiveDataset):
@@ -315,6 +549,7 @@ class SMLMAPrioriDataset(SMLMLiveDataset):
         self._emitter = tar_emitter
         self._em_split = tar_emitter.split_in_frames(0, frames.size(0) - 1)
         self._target, self._weight = target, weight
+        self._setup_frames_mf()
 
     def __getitem__(self, ix):
         """
@@ -325,22 +560,35 @@ class SMLMAPrioriDataset(SMLMLiveDataset):
         Returns:
 
         """
-        """Pad index, get frames and emitters."""
+        """Pad index, get frames and emitters. The multi-frame view is indexed by the raw index."""
+        frames = self._window(ix)
         ix = self._pad_index(ix)
 
-        return self._return_sample(self._get_frames(self._frames, ix), [tar[ix] for tar in self._target],  # target is tuple
+        return self._return_sample(frames, [tar[ix] for tar in self._target],  # target is tuple
                                    self._weight[ix] if self._weight is not None else None,
                                    self._em_split[ix])
 
 
 class SMLMLiveSampleDataset(SMLMDataset):
     """
-    A SMLM dataset where a new sample is drawn per (training) sample.
+    A SMLM dataset where a new sample is drawn per (training) sample. Optionally a ring buffer of precomputed
+    samples can be used to amortize the simulation cost; entries are then refreshed gradually on access instead
+    of re-running the whole simulation pipeline for every sample.
 
     """
 
     def __init__(self, *, simulator, ds_len, em_proc, frame_proc, bg_frame_proc, tar_gen, weight_gen, frame_window,
-                 return_em=False):
+                 return_em=False, buffer_size: int = None, refresh_every: int = 1):
+        """
+
+        Args:
+            simulator: simulator instance
+            ds_len: apparent length of the dataset
+            buffer_size: size of the sample ring buffer. If None (default), a new sample is simulated on
+                every access.
+            refresh_every: refresh one buffer entry every n accesses. The average number of reads per
+                simulation equals this value; higher values trade staleness for speed.
+        """
         super().__init__(em_proc=em_proc, frame_proc=frame_proc, bg_frame_proc=bg_frame_proc,
                          tar_gen=tar_gen, weight_gen=weight_gen,
                          frame_window=frame_window, pad=None, return_em=return_em)
@@ -348,13 +596,16 @@ class SMLMLiveSampleDataset(SMLMDataset):
         self.simulator = simulator
         self.ds_len = ds_len
 
+        self.buffer_size = buffer_size
+        self.refresh_every = refresh_every
+        self._buffer = None  # filled lazily, each DataLoader worker holds its own buffer
+        self._reads_since_refresh = 0
+
     def __len__(self):
         return self.ds_len
 
-    def __getitem__(self, ix):
-        """Sample"""
-        emitter, frames, bg_frames = self.simulator.sample()
-
+    def _process_acquisition(self, emitter, frames, bg_frames):
+        """Process one simulated acquisition into a training sample."""
         assert frames.size(0) % 2 == 1
         frames = self._get_frames(frames, (frames.size(0) - 1) // 2)
         tar_emitter = emitter.get_subset_frame(0, 0)  # target emitters are the zero ones
@@ -363,3 +614,35 @@ class SMLMLiveSampleDataset(SMLMDataset):
         frames, target, weight, tar_emitter = self._process_sample(frames, tar_emitter, bg_frames)
 
         return self._return_sample(frames, target, weight, tar_emitter)
+
+    def _sample_new(self):
+        """Run the whole simulation pipeline and process a single new sample."""
+        return self._process_acquisition(*self.simulator.sample())
+
+    def _sample_buffer(self) -> list:
+        """
+        Fill the sample buffer. Where the simulator supports it (static frame range), all acquisitions are
+        drawn in one batched simulator call instead of buffer_size individual pipeline runs.
+
+        """
+        if hasattr(self.simulator, 'sample_n') and None not in getattr(self.simulator, 'frame_range', (None, None)):
+            emitter, frames, bg_frames = self.simulator.sample_n(self.buffer_size)
+            return [self._process_acquisition(e, f, b)
+                    for e, f, b in zip(emitter, frames.unbind(0), bg_frames.unbind(0))]
+
+        return [self._sample_new() for _ in range(self.buffer_size)]
+
+    def __getitem__(self, ix):
+        """Sample"""
+        if self.buffer_size is None:
+            return self._sample_new()
+
+        if self._buffer is None:
+            self._buffer = self._sample_buffer()
+
+        self._reads_since_refresh += 1
+        if self._reads_since_refresh >= self.refresh_every:
+            self._reads_since_refresh = 0
+            self._buffer[ix % self.buffer_size] = self._sample_new()
+
+        return self._buffer[ix % self.buffer_size]
@@ -7,6 +7,7 @@ from decode.evaluation import predict_dist
 from decode.generic import EmitterSet
 from decode.generic import process
 from decode.generic.process import RemoveOutOfFOV
+from decode.generic.utils import cum_count_per_group
 from decode.simulation.psf_kernel import DeltaPSF
 
 
@@ -28,6 +29,8 @@ class TargetGenerator(ABC):
         self.ix_high = ix_high
         self.squeeze_batch_dim = squeeze_batch_dim
 
+        self._fov_filter = None  # set by implementations that limit emitters to a field of view
+
         self.sanity_check()
 
     def sanity_check(self):
@@ -37,7 +40,8 @@ class TargetGenerator(ABC):
 
     def _filter_forward(self, em: EmitterSet, ix_low: (int, None), ix_high: (int, None)):
         """
-        Filter emitters and auto-set frame bounds
+        Filter emitters and auto-set frame bounds. Frame range and (optional) field of view are combined into a
+        single mask, such that the emitter attributes are gathered only once.
 
         Args:
             em:
@@ -56,8 +60,14 @@ class TargetGenerator(ABC):
         if ix_high is None:
             ix_high = self.ix_high
 
-        """Limit the emitters to the frames of interest and shift the frame index to start at 0."""
-        em = em.get_subset_frame(ix_low, ix_high, -ix_low)
+        """Limit the emitters to the frames of interest (and FOV) and shift the frame index to start at 0."""
+        mask = (em.frame_ix >= ix_low) * (em.frame_ix <= ix_high)
+        if self._fov_filter is not None:
+            mask *= self._fov_filter.clean_mask(em)
+
+        em = em[mask]
+        if ix_low != 0 and len(em) != 0:
+            em.frame_ix = em.frame_ix - ix_low
 
         return em, ix_low, ix_high
 
@@ -78,6 +88,51 @@ class TargetGenerator(ABC):
 
         return x
 
+    @staticmethod
+    def _cat_samples(em: list) -> EmitterSet:
+        """
+        Concatenate a list of single-sample EmitterSets such that all emitters of the i-th set sit on frame
+        index i, independent of their original frame index.
+
+        Args:
+            em: list of EmitterSets, one per sample
+
+        """
+
+        em_cat = EmitterSet.cat(em)
+        em_cat.frame_ix = torch.arange(len(em)).repeat_interleave(torch.tensor([len(e) for e in em]))
+
+        return em_cat
+
+    def forward_list(self, em: list, bg: list = None) -> torch.Tensor:
+        """
+        Forward a list of single-sample EmitterSets in one batched call. Sample i ends up in batch element i.
+        Equivalent to stacking len(em) individual forward calls, but the python and kernel dispatch overhead
+        is paid once instead of per sample.
+
+        Args:
+            em: list of EmitterSets, one per sample
+            bg: optional list of background frames, one per sample
+
+        Returns:
+            stacked target frames, with batch dimension of len(em)
+
+        """
+
+        em_cat = self._cat_samples(em)
+
+        squeeze = self.squeeze_batch_dim
+        self.squeeze_batch_dim = False
+        try:
+            target = self.forward(em_cat, bg=None, ix_low=0, ix_high=len(em) - 1)
+        finally:
+            self.squeeze_batch_dim = squeeze
+
+        if bg is not None:
+            target = torch.cat((target, torch.stack(list(bg), 0).unsqueeze(1)), 1)
+
+        return target
+
     @abstractmethod
     def forward(self, em: EmitterSet, bg: torch.Tensor = None, ix_low: int = None, ix_high: int = None) -> torch.Tensor:
         """
@@ -99,19 +154,34 @@ class TargetGenerator(ABC):
 class UnifiedEmbeddingTarget(TargetGenerator):
 
     def __init__(self, xextent: tuple, yextent: tuple, img_shape: tuple, roi_size: int, ix_low=None, ix_high=None,
-                 squeeze_batch_dim: bool = False):
+                 squeeze_batch_dim: bool = False, device: Union[str, torch.device] = 'cpu'):
+        """
+
+        Args:
+            xextent: extent of the target map in x
+            yextent: extent of the target map in y
+            img_shape: image shape
+            roi_size: size of the ROI around the central pixel
+            ix_low: lower frame index
+            ix_high: upper frame index
+            squeeze_batch_dim: squeeze batch dimension before return
+            device: device on which the target scatter is computed, e.g. 'cuda'. The returned target is always
+                on the CPU, i.e. for non-CPU devices the target is read back once per forward call.
+        """
         super().__init__(xy_unit='px', ix_low=ix_low, ix_high=ix_high, squeeze_batch_dim=squeeze_batch_dim)
 
         self._roi_size = roi_size
         self.img_shape = img_shape
+        self.device = torch.device(device)
 
         self.mesh_x, self.mesh_y = torch.meshgrid(
             (torch.arange(-(self._roi_size - 1) // 2, (self._roi_size - 1) // 2 + 1),) * 2)
+        self.mesh_x, self.mesh_y = self.mesh_x.to(self.device), self.mesh_y.to(self.device)
 
         self._delta_psf = DeltaPSF(xextent=xextent, yextent=yextent, img_shape=img_shape)
-        self._em_filter = process.RemoveOutOfFOV(xextent=xextent, yextent=yextent, zextent=None, xy_unit='px')
-        self._bin_ctr_x = self._delta_psf.bin_ctr_x
-        self._bin_ctr_y = self._delta_psf.bin_ctr_y
+        self._fov_filter = process.RemoveOutOfFOV(xextent=xextent, yextent=yextent, zextent=None, xy_unit='px')
+        self._bin_ctr_x = self._delta_psf.bin_ctr_x.to(self.device)
+        self._bin_ctr_y = self._delta_psf.bin_ctr_y.to(self.device)
 
     @property
     def xextent(self):
@@ -158,7 +228,7 @@ class UnifiedEmbeddingTarget(TargetGenerator):
         batch_ix_roi = batch_ix.repeat_interleave(n_roi)
         x_ix_roi = x_ix.repeat_interleave(n_roi)
         y_ix_roi = y_ix.repeat_interleave(n_roi)
-        id = torch.arange(x_ix.size(0)).repeat_interleave(n_roi)
+        id = torch.arange(x_ix.size(0), device=batch_ix.device).repeat_interleave(n_roi)
 
         """Repeat offsets accordingly and add"""
         offset_x = xx.repeat(x_ix.size(0))
@@ -196,21 +266,6 @@ class UnifiedEmbeddingTarget(TargetGenerator):
 
         return xy_tar
 
-    def _filter_forward(self, em: EmitterSet, ix_low: (int, None), ix_high: (int, None)):
-        """
-        Filter as in abstract class, plus kick out emitters that are outside the frame
-
-        Args:
-            em:
-            ix_low:
-            ix_high:
-
-        """
-        em, ix_low, ix_high = super()._filter_forward(em, ix_low, ix_high)
-        em = self._em_filter.forward(em)  # kick outside of frame out
-
-        return em, ix_low, ix_high
-
     def forward_(self, xyz: torch.Tensor, phot: torch.Tensor, frame_ix: torch.LongTensor,
                  ix_low: int, ix_high: int) -> torch.Tensor:
         """Get index of central bin for each emitter."""
@@ -218,12 +273,17 @@ class UnifiedEmbeddingTarget(TargetGenerator):
 
         assert isinstance(frame_ix, torch.LongTensor)
 
+        """Move to the computation device. The bin search happens on the CPU, the scatter on self.device."""
+        if self.device.type != 'cpu':
+            xyz, phot, frame_ix = xyz.to(self.device), phot.to(self.device), frame_ix.to(self.device)
+            x_ix, y_ix = x_ix.to(self.device), y_ix.to(self.device)
+
         """Get the indices of the ROIs around the ctrl pixel"""
         batch_ix_roi, x_ix_roi, y_ix_roi, offset_x, offset_y, id = self._get_roi_px(frame_ix, x_ix, y_ix)
 
         batch_size = ix_high - ix_low + 1
 
-        target = torch.zeros((batch_size, 5, *self.img_shape))
+        target = torch.zeros((batch_size, 5, *self.img_shape), device=self.device)
         target[:, 0] = self.single_px_target(frame_ix, x_ix, y_ix, batch_size)
         target[:, 1] = self.const_roi_target(batch_ix_roi, x_ix_roi, y_ix_roi, phot, id, batch_size)
         target[:, 2:4] = self.xy_target(batch_ix_roi, x_ix_roi, y_ix_roi, xyz[:, :2], id, batch_size)
@@ -235,6 +295,9 @@ class UnifiedEmbeddingTarget(TargetGenerator):
         em, ix_low, ix_high = self._filter_forward(em, ix_low, ix_high)  # filter em that are out of view
         target = self.forward_(xyz=em.xyz_px, phot=em.phot, frame_ix=em.frame_ix, ix_low=ix_low, ix_high=ix_high)
 
+        if target.device.type != 'cpu':  # read back once per (batched) forward call
+            target = target.cpu()
+
         if bg is not None:
             target = torch.cat((target, bg.unsqueeze(0).unsqueeze(0)), 1)
 
@@ -265,12 +328,6 @@ class ParameterListTarget(TargetGenerator):
 
         self._fov_filter = RemoveOutOfFOV(xextent=xextent, yextent=yextent, xy_unit=xy_unit)
 
-    def _filter_forward(self, em: EmitterSet, ix_low: (int, None), ix_high: (int, None)):
-        em, ix_low, ix_high = super()._filter_forward(em, ix_low, ix_high)
-        em = self._fov_filter.forward(em)
-
-        return em, ix_low, ix_high
-
     def forward(self, em: EmitterSet, bg: torch.Tensor = None, ix_low: int = None, ix_high: int = None):
         em, ix_low, ix_high = self._filter_forward(em, ix_low, ix_high)
 
@@ -287,21 +344,38 @@ class ParameterListTarget(TargetGenerator):
         else:
             raise NotImplementedError
 
-        """Set number of active elements per frame"""
-        for i in range(n_frames):
-            n_emitter = len(em.get_subset_frame(i, i))
+        """Scatter all emitters into their frame's row at once. The slot of an emitter within its frame is its
+        cumulative count per frame, which preserves the original order among emitters of the same frame."""
+        if len(em) >= 1:
+            slot_ix = cum_count_per_group(em.frame_ix)
 
-            if n_emitter > self.n_max:
+            if int(slot_ix.max()) >= self.n_max:
                 raise ValueError("Number of actual emitters exceeds number of max. emitters.")
 
-            mask_tar[i, :n_emitter] = 1
-
-            ix = em.frame_ix == i
-            param_tar[i, :n_emitter, 0] = em[ix].phot
-            param_tar[i, :n_emitter, 1:] = xyz[ix]
+            mask_tar[em.frame_ix, slot_ix] = 1
+            param_tar[em.frame_ix, slot_ix, 0] = em.phot
+            param_tar[em.frame_ix, slot_ix, 1:] = xyz
 
         return self._postprocess_output(param_tar), self._postprocess_output(mask_tar), bg
 
+    def forward_list(self, em: list, bg: list = None):
+        """
+        Batched forward over a list of single-sample EmitterSets; cf. TargetGenerator.forward_list. Returns
+        stacked parameter and mask targets and the stacked background.
+
+        """
+
+        em_cat = self._cat_samples(em)
+
+        squeeze = self.squeeze_batch_dim
+        self.squeeze_batch_dim = False
+        try:
+            param_tar, mask_tar, _ = self.forward(em_cat, bg=None, ix_low=0, ix_high=len(em) - 1)
+        finally:
+            self.squeeze_batch_dim = squeeze
+
+        return param_tar, mask_tar, torch.stack(list(bg), 0) if bg is not None else None
+
 
 class DisableAttributes:
 
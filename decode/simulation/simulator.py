@@ -56,6 +56,40 @@ class Simulation:
         frames, bg = self.forward(emitter)
         return emitter, frames, bg
 
+    def sample_n(self, n: int):
+        """
+        Sample n independent acquisitions and forward them through the simulation pipeline in a single
+        batched call. The acquisitions are stacked along the frame dimension for the forward and split up
+        again afterwards; compared to n sample() calls the psf is evaluated once.
+
+        Args:
+            n: number of acquisitions
+
+        Returns:
+            list of EmitterSet: sampled emitters, one set per acquisition
+            torch.Tensor: simulated frames of size :math:`(n, T, H, W)`
+            torch.Tensor: background frames of same size
+
+        """
+
+        ix_low, ix_high = self.frame_range
+        if ix_low is None or ix_high is None:
+            raise ValueError("Batched sampling requires a static frame range.")
+
+        n_frames = ix_high - ix_low + 1
+        emitter = [self.em_sampler() for _ in range(n)]
+
+        """Put acquisition i on frames [ix_low + i * n_frames, ix_high + i * n_frames] and run the pipeline
+        once over all of them."""
+        em_cat = EmitterSet.cat(emitter, step_frame_ix=n_frames)
+        frames, bg_frames = self.forward(em_cat, ix_low=ix_low, ix_high=ix_high + (n - 1) * n_frames)
+
+        frames = frames.view(n, n_frames, *frames.size()[1:])
+        if bg_frames is not None:
+            bg_frames = bg_frames.view(n, n_frames, *bg_frames.size()[1:])
+
+        return emitter, frames, bg_frames
+
     def forward(self, em: EmitterSet, ix_low: Union[None, int] = None, ix_high: Union[None, int] = None) -> Tuple[
         torch.Tensor, torch.Tensor]:
         """
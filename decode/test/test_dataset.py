@@ -79,6 +79,73 @@ class TestDataset:
 
         assert frs.size(0) == ds.frame_window
 
+    def test_getitems(self, ds):
+        """
+        Batched fetch must be consistent with per-index fetch.
+
+        Args:
+            ds: fixture
+
+        """
+        ixs = [0, 10, 99]
+
+        """Run"""
+        samples = ds.__getitems__(ixs)
+
+        """Tests"""
+        assert len(samples) == len(ixs)
+        for ix, sample in zip(ixs, samples):
+            ref = ds[ix]
+            frs = sample[0] if isinstance(sample, tuple) else sample
+            frs_ref = ref[0] if isinstance(ref, tuple) else ref
+
+            assert (frs == frs_ref).all()
+
+    @pytest.mark.parametrize("ix", [0, 42, 99])
+    def test_precomputed_targets(self, ds, ix):
+        """
+        Precomputed targets must equal on-the-fly generated targets.
+
+        Args:
+            ds: fixture
+            ix: index
+
+        """
+        if ds.tar_gen is None:
+            return
+
+        sample_cached = ds[ix]
+
+        """Disable the cache and compare"""
+        ds._tar_cache, tar_cache = None, ds._tar_cache
+        try:
+            sample_live = ds[ix]
+        finally:
+            ds._tar_cache = tar_cache
+
+        assert (sample_cached[1] == sample_live[1]).all()
+
+    def test_frame_dtype(self):
+        """
+        Reduced precision storage must cast back to the input dtype on return.
+
+        """
+        ds = can.SMLMStaticDataset(frames=torch.rand((10, 4, 4)), emitter=None, frame_window=3, pad='same',
+                                   return_em=False, frame_dtype=torch.float16)
+
+        assert ds._frames.dtype == torch.float16
+
+        frs = ds[0][0]
+        assert frs.dtype == torch.float32
+
+    def test_share_memory(self):
+        frames = torch.rand((10, 4, 4))
+        ds = can.SMLMStaticDataset(frames=frames, emitter=None, frame_window=3, pad='same',
+                                   return_em=False, share_memory=True)
+
+        assert ds._frames.is_shared()
+        assert (ds[1][0] == frames[:3]).all()
+
 
 class TestInferenceDataset(TestDataset):
 
@@ -226,17 +293,19 @@ class TestLiveSampleDataset:
     def ds(self):
         class DummySimulation(Simulation):
             def __init__(self):
-                pass
+                self.frame_range = (-1, 1)  # static, so that the batched buffer fill via sample_n is used
 
-            def sample(self):
+            def em_sampler(self):
                 em = decode.RandomEmitterSet(150)
                 em.frame_ix = torch.randint_like(em.frame_ix, -1, 2)
-                frames, bg_frames = self.forward(em)
+                return em
 
-                return em, frames, bg_frames
+            def forward(self, em, ix_low=None, ix_high=None):
+                ix_low = self.frame_range[0] if ix_low is None else ix_low
+                ix_high = self.frame_range[1] if ix_high is None else ix_high
+                n = ix_high - ix_low + 1
 
-            def forward(self, em):
-                return torch.rand((3, 64, 64)), torch.rand((3, 64, 64))
+                return torch.rand((n, 64, 64)), torch.rand((n, 64, 64))
 
         class DummyTarAndWeightGen:
             def forward(self, *args):
@@ -273,3 +342,18 @@ class TestLiveSampleDataset:
         assert x.dim() == 3
         assert y_tar.dim() == 3
         assert weight.dim() == 3
+
+    def test_buffer(self, ds):
+
+        """Setup"""
+        ds.buffer_size = 8
+        ds.refresh_every = 4
+
+        """Run"""
+        sample_a = ds[0]
+        sample_b = ds[0]
+
+        """Assert"""
+        assert len(ds._buffer) == ds.buffer_size
+        assert len(sample_a) == len(sample_b)
+        assert sample_a[0].dim() == 3
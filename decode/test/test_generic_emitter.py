@@ -48,6 +48,15 @@ def em3d_full(em3d):
 
 class TestEmitterSet:
 
+    def test_numpy_init(self):
+        """Construction from ndarrays must work and share memory with the arrays (zero-copy)."""
+
+        xyz = np.random.rand(20, 3).astype('float32')
+        em = EmitterSet(xyz=xyz, phot=np.ones(20, dtype='float32'), frame_ix=np.zeros(20, dtype='int64'),
+                        xy_unit='px')
+
+        assert em.xyz.data_ptr() == xyz.__array_interface__['data'][0]
+
     def test_properties(self, em2d, em3d, em3d_full):
 
         for em in (em2d, em3d, em3d_full):
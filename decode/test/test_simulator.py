@@ -50,6 +50,26 @@ class TestSimulator:
         """Assertions"""
         assert isinstance(em, emitter.EmitterSet)
 
+    def test_sample_n(self, sim):
+        """Setup"""
+
+        def dummy_sampler():
+            em = emitter.RandomEmitterSet(20)
+            em.frame_ix = torch.randint_like(em.frame_ix, -1, 2)
+            return em
+
+        sim.em_sampler = dummy_sampler
+        sim.frame_range = (-1, 1)
+
+        """Run"""
+        em, frames, bg_frames = sim.sample_n(5)
+
+        """Assertions"""
+        assert len(em) == 5
+        assert frames.size() == torch.Size([5, 3, *sim.psf.img_shape])
+        assert bg_frames.size() == frames.size()
+        assert all((e.frame_ix.abs() <= 1).all() for e in em), "Emitters must keep their own frame indices."
+
     @pytest.mark.parametrize("ix_low,ix_high,n", [(None, None, 6),
                                                   (0, None, 4),
                                                   (None, 0, 3),
@@ -158,6 +158,38 @@ class TestUnifiedEmbeddingTarget(TestTargetGenerator):
         assert (out[(xyz[:, 0] < -0.5) * (xyz[:, 0] >= 63.5)] == 0).all()
         assert (out.nonzero()[:, 0].unique() == frame_ix[(xyz[:, 0] >= -0.5) * (xyz[:, 0] < 63.5)]).all()
 
+    @pytest.mark.skipif(not torch.cuda.is_available(), reason="Needs CUDA.")
+    def test_forward_device(self, targ, random_emitter):
+        """
+        Target computed on CUDA must equal the CPU implementation and be returned on the CPU.
+        """
+
+        targ_cuda = target_generator.UnifiedEmbeddingTarget(targ.xextent, targ.yextent, targ.img_shape,
+                                                            roi_size=targ._roi_size, ix_low=0, ix_high=5,
+                                                            device='cuda')
+
+        out_cpu = targ.forward(random_emitter)
+        out_cuda = targ_cuda.forward(random_emitter)
+
+        assert out_cuda.device == torch.device('cpu')
+        assert tutil.tens_almeq(out_cpu, out_cuda, 1e-6)
+
+    def test_forward_list(self, targ):
+        """
+        Batched forward over a list of single-sample emitter sets must equal the per-sample forward calls.
+        """
+
+        """Setup"""
+        em = [RandomEmitterSet(20, xy_unit='px') for _ in range(4)]
+
+        """Run"""
+        out = targ.forward_list(em)
+
+        """Assert"""
+        assert out.size(0) == len(em)
+        for i, e in enumerate(em):
+            assert tutil.tens_almeq(out[i], targ.forward(e, None, 0, 0)[0])
+
     def test_forward_different_impl(self, targ):
         """
         Test the implementation with a slow for loop
@@ -310,3 +342,13 @@ class TestParameterListTarget(TestTargetGenerator):
         assert (param_tar[[0, 1], 0, 0] == fem.phot).all()
         assert (param_tar[[0, 1], 0, 1:] == fem.xyz_px).all()
         assert (param_tar[2:] == 0.).all()
+
+    def test_forward_list(self, targ, fem):
+        """Run"""
+        param_tar, mask_tar, bg = targ.forward_list(fem.split_in_frames(0, 1))
+        param_ref, mask_ref, _ = targ.forward(fem)
+
+        """Assert"""
+        assert (param_tar == param_ref).all()
+        assert (mask_tar == mask_ref).all()
+        assert bg is None
@@ -28,6 +28,29 @@ def online_tiff_writer(path, iterations: int, sleep: float, out_queue=None):
         tifffile.imwrite(path, data=chunk.numpy(), ome=True, append=True)
 
 
+def test_load_memmap(tmpdir):
+    import numpy as np
+
+    data = torch.rand(50, 8, 8)
+
+    """npy file"""
+    fname = tmpdir / 'frames.npy'
+    np.save(str(fname), data.numpy())
+
+    frames = frames_io.load_memmap(fname)
+    assert (frames == data).all()
+
+    """raw binary"""
+    fname = tmpdir / 'frames.bin'
+    data.numpy().tofile(str(fname))
+
+    frames = frames_io.load_memmap(fname, shape=(50, 8, 8), dtype='float32')
+    assert (frames == data).all()
+
+    with pytest.raises(ValueError):
+        frames_io.load_memmap(fname)  # raw binary without shape
+
+
 def test_tiff_tensor(tmpdir):
     fname = tmpdir / 'static.tiff'
 
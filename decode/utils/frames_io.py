@@ -1,5 +1,6 @@
 import warnings
 
+import numpy as np
 import torch
 import pathlib
 import tifffile
@@ -51,6 +52,37 @@ def load_tif(path: (str, pathlib.Path), multifile=True) -> torch.Tensor:
     return frames
 
 
+def load_memmap(path: (str, pathlib.Path), shape: tuple = None, dtype: str = 'float32',
+                offset: int = 0) -> torch.Tensor:
+    """
+    Memory-maps frames from a .npy or raw binary file and wraps them zero-copy as tensor. Pages are loaded
+    lazily on access, i.e. the frames may exceed the machine's RAM. The map is opened copy-on-write, so
+    modifications never reach the file.
+
+    Args:
+        path: path to the .npy or raw binary file
+        shape: shape of the frames, e.g. (N, H, W). Ignored for .npy files which store their shape.
+        dtype: numpy dtype of the raw binary data. Ignored for .npy files.
+        offset: offset in bytes into the raw binary file
+
+    Returns:
+        torch.Tensor: memory-mapped frames
+
+    """
+
+    p = pathlib.Path(path)
+
+    if p.suffix == '.npy':
+        frames = np.load(str(p), mmap_mode='c')
+    else:
+        if shape is None:
+            raise ValueError("Shape must be specified for raw binary files.")
+
+        frames = np.memmap(str(p), dtype=dtype, mode='c', shape=shape, offset=offset)
+
+    return torch.from_numpy(frames)
+
+
 class TiffTensor:
     def __init__(self, file, dtype='float32'):
         """